@@ -0,0 +1,482 @@
+"""Concurrent-user load test for the Dash callbacks in `app.py`.
+
+The harness replaces AlphaVantage with a local stand-in that serves synthetic
+price histories, points the database and model directory at a throwaway
+workspace, and then lets many simulated users drive `price_volatility_graph`
+and `predict` at the same time. It reports throughput, p50/p95/p99 latency,
+error rate and cross-session mismatches for each callback.
+
+Usage:
+------
+    python loadtest.py --users 25 --iterations 4
+    python loadtest.py --mode http --users 50 --skip-sleeps --json results.json
+    python loadtest.py --users 1 --iterations 2 --skip-sleeps --strict   # smoke check
+"""
+
+import argparse
+import contextlib
+import functools
+import importlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+REPO_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class StubAlphaVantage:
+    """Local stand-in for the AlphaVantage daily adjusted endpoint
+
+    Parameters:
+    -----------
+    n_days: int
+        The number of business days of synthetic history served per ticker. A real
+        "full" download for long-listed tickers such as IBM runs to 6000+ rows.
+    latency: float
+        Seconds to sleep on every request to mimic the network round trip.
+    seed: int
+        Base seed, so every run serves the same price histories.
+    """
+
+    def __init__(self, n_days=6000, latency=0.0, seed=42):
+        self.n_days = n_days
+        self.latency = latency
+        self.seed = seed
+        self.n_requests = 0
+        self.__payloads = {}
+        self.__lock = threading.Lock()
+
+    def _synthetic_payload(self, ticker):
+        """Build a geometric brownian motion price history in AlphaVantage JSON format"""
+        rng = np.random.default_rng(self.seed + sum(ord(c) for c in ticker))
+        dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=self.n_days)
+
+        #Daily log returns with a volatility that drifts, so GARCH has something to fit
+        volatility = 0.01 + 0.01 * np.abs(np.sin(np.linspace(0, 12, self.n_days)))
+        returns = rng.normal(0.0003, volatility)
+        close = 100 * np.exp(np.cumsum(returns))
+        open_ = close * (1 + rng.normal(0, 0.002, self.n_days))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, self.n_days)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, self.n_days)))
+
+        #AlphaVantage returns the newest day first, and `read_table` relies on that order
+        series = {}
+        for i in range(self.n_days - 1, -1, -1):
+            date = dates[i]
+            series[date.strftime("%Y-%m-%d")] = {
+                "1. open": f"{open_[i]:.4f}",
+                "2. high": f"{high[i]:.4f}",
+                "3. low": f"{low[i]:.4f}",
+                "4. close": f"{close[i]:.4f}",
+                "5. adjusted close": f"{close[i]:.4f}",
+                "6. volume": str(int(rng.integers(1e5, 1e7))),
+                "7. dividend amount": "0.0000",
+                "8. split coefficient": "1.0",
+            }
+        return {"Meta Data": {"2. Symbol": ticker}, "Time Series (Daily)": series}
+
+    def get(self, url, **kwargs):
+        """Drop-in replacement for `requests.get` as used by `AlphaVantageApi`"""
+        query = dict(part.split("=", 1) for part in url.split("?", 1)[1].split("&") if "=" in part)
+        ticker = query.get("symbol", "")
+
+        with self.__lock:
+            self.n_requests += 1
+            if ticker not in self.__payloads:
+                self.__payloads[ticker] = self._synthetic_payload(ticker)
+            payload = self.__payloads[ticker]
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        response = types.SimpleNamespace()
+        response.status_code = 200
+        response.json = lambda: payload
+        return response
+
+
+class CallbackStats:
+    """Thread-safe collector of latencies and failures for one callback"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = {}
+        self.mismatches = 0
+        self.__lock = threading.Lock()
+
+    def record(self, latency, error=None, mismatch=False):
+        with self.__lock:
+            self.latencies.append(latency)
+            if error is not None:
+                self.errors[error] = self.errors.get(error, 0) + 1
+            if mismatch:
+                self.mismatches += 1
+
+    def summary(self, wall_time):
+        """Summarise the recorded calls
+
+        Parameters:
+        -----------
+        wall_time: float
+            Duration of the whole run in seconds, used for throughput.
+
+        Returns:
+        --------
+        dict
+            Request count, throughput, error and mismatch rates and latency percentiles in milliseconds.
+        """
+        n_requests = len(self.latencies)
+        n_errors = sum(self.errors.values())
+        latencies = np.array(self.latencies) * 1000 if n_requests else np.zeros(1)
+        return {
+            "callback": self.name,
+            "requests": n_requests,
+            "throughput_rps": n_requests / wall_time if wall_time else 0.0,
+            "errors": n_errors,
+            "error_rate": n_errors / n_requests if n_requests else 0.0,
+            "mismatches": self.mismatches,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "mean_ms": float(latencies.mean()),
+            "max_ms": float(latencies.max()),
+            "error_types": dict(self.errors),
+        }
+
+
+_APP_MODULES = ("config", "data", "model", "enginehouse", "app")
+_ENVIRON_KEYS = ("ALPHA_API_KEY", "DB_NAME", "MODEL_DIRECTORY")
+
+#Ticker most recently passed to `GarchModel.load` on each thread
+_loaded = threading.local()
+
+
+def _recording_load(load):
+    """Wrap `GarchModel.load` so each thread records which ticker's model it loaded"""
+    @functools.wraps(load)
+    def wrapper(self):
+        _loaded.ticker = self.ticker
+        return load(self)
+    return wrapper
+
+
+def _prefit_models(app, stale_models=False):
+    """Fit and dump one model per ticker in `item_list`
+
+    `predict` lists `models/` and expects at least one file, so an empty directory makes
+    every call fail. With today's models in place it takes the `predict_volatility` path.
+    With `stale_models` the files are dated yesterday, so the first `predict` per ticker
+    takes the `fit_model` path, as it does on the first request of each day.
+    """
+    enginehouse = importlib.import_module("enginehouse")
+    yesterday = pd.Timestamp.now() - pd.Timedelta(days=1)
+    for symbol in app.item_list:
+        model = enginehouse.build_model(symbol.split('-')[0], use_new_data=True)
+        model.wrangle_data(n_observations=2000)
+        model.fit(p=1, q=1)
+        filepath = model.dump()
+
+        if stale_models:
+            #Keep the fractional seconds, `predict` splits the file name on '.'
+            timestamp = yesterday.strftime("%Y-%m-%dT%H:%M:%S.%f")
+            os.rename(filepath, os.path.join(os.path.dirname(filepath), f"{timestamp}_{model.ticker}.pkl"))
+
+
+@contextlib.contextmanager
+def loadtest_workspace(stub, skip_sleeps=False, stale_models=False, keep_workspace=False):
+    """Import a fresh `app` against an isolated, pre-fitted working directory
+
+    `config.settings` and the `models/` lookup in `predict` both resolve against the
+    current directory, so the harness chdirs into a temporary workspace before the
+    import. Environment variables take precedence over `.env` in pydantic settings.
+    The application modules are re-imported on every entry, so the settings and the
+    shared SQLite connection always point at the current workspace. Patched
+    attributes, modules, environment and working directory are restored on exit.
+
+    Parameters:
+    -----------
+    stub: StubAlphaVantage
+        Stand-in that receives every AlphaVantage request.
+    skip_sleeps: bool
+        Disable the fixed `time.sleep` calls inside the callbacks.
+    stale_models: bool
+        Date the pre-fitted models yesterday so `predict` refits them under load.
+    keep_workspace: bool
+        Keep the temporary database and models after exit.
+
+    Yields:
+    -------
+    module
+        The freshly imported `app` module.
+    """
+    workspace = tempfile.mkdtemp(prefix="volatility_loadtest_")
+    os.makedirs(os.path.join(workspace, "models"))
+    cwd = os.getcwd()
+    saved_environ = {key: os.environ.get(key) for key in _ENVIRON_KEYS}
+    saved_modules = {name: sys.modules.pop(name) for name in _APP_MODULES if name in sys.modules}
+    added_path = REPO_DIRECTORY not in sys.path
+
+    try:
+        os.chdir(workspace)
+        os.environ["ALPHA_API_KEY"] = "loadtest"
+        os.environ["DB_NAME"] = os.path.join(workspace, "stocks.sqlite")
+        os.environ["MODEL_DIRECTORY"] = "models"
+        if added_path:
+            sys.path.insert(0, REPO_DIRECTORY)
+
+        #Route every AlphaVantage request to the local stand-in
+        data = importlib.import_module("data")
+        original_requests = data.requests
+        data.requests = types.SimpleNamespace(get=stub.get)
+
+        model = importlib.import_module("model")
+        original_load = model.GarchModel.load
+        model.GarchModel.load = _recording_load(original_load)
+
+        app = importlib.import_module("app")
+        original_time = app.time
+        try:
+            if skip_sleeps:
+                app.time = types.SimpleNamespace(sleep=lambda seconds: None)
+            _prefit_models(app, stale_models=stale_models)
+            yield app
+        finally:
+            app.time = original_time
+            model.GarchModel.load = original_load
+            data.requests = original_requests
+            app.work_flow.repo.connection.close()
+    finally:
+        for name in _APP_MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved_modules)
+        for key, value in saved_environ.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if added_path:
+            sys.path.remove(REPO_DIRECTORY)
+        os.chdir(cwd)
+        if not keep_workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def _figure_title(figure):
+    """Extract the title text from a plotly figure or its JSON form"""
+    try:
+        if isinstance(figure, dict):
+            return figure["layout"]["title"]["text"]
+        return figure.layout.title.text
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+class DirectDriver:
+    """Call the undecorated callback functions in-process"""
+
+    def __init__(self, app):
+        self.price_volatility_graph = getattr(app.price_volatility_graph, "__wrapped__", app.price_volatility_graph)
+        self.predict = getattr(app.predict, "__wrapped__", app.predict)
+
+    def call_price_volatility_graph(self, symbol, option):
+        return _figure_title(self.price_volatility_graph(symbol, option).figure)
+
+    def call_predict(self, symbol):
+        return _figure_title(self.predict(symbol).figure)
+
+
+class HttpDriver:
+    """Post callback requests to the Dash Flask server through its test client"""
+
+    def __init__(self, app):
+        self.server = app.app.server
+        self.__local = threading.local()
+
+        #Re-raise callback exceptions in the test client instead of turning them into a 500,
+        #so error types are reported the same way as in direct mode
+        self.server.config["PROPAGATE_EXCEPTIONS"] = True
+
+        #The first request registers the callback map on the server
+        self.server.test_client().get("/_dash-layout")
+
+    def _client(self):
+        if not hasattr(self.__local, "client"):
+            self.__local.client = self.server.test_client()
+        return self.__local.client
+
+    def _dispatch(self, output_id, inputs):
+        payload = {
+            "output": f"{output_id}.children",
+            "outputs": {"id": output_id, "property": "children"},
+            "inputs": [{"id": i, "property": "value", "value": v} for i, v in inputs],
+            "changedPropIds": [f"{inputs[0][0]}.value"],
+            "state": [],
+        }
+        response = self._client().post("/_dash-update-component", json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        children = response.get_json()["response"][output_id]["children"]
+        return _figure_title(children["props"]["figure"])
+
+    def call_price_volatility_graph(self, symbol, option):
+        return self._dispatch("price_volatility", [("select", symbol), ("radio_items", option)])
+
+    def call_predict(self, symbol):
+        return self._dispatch("my_prediction", [("select", symbol)])
+
+
+def _timed(stats, func, *args, check):
+    """Time one callback call and record the outcome in stats
+
+    `check` receives the call's result and returns True when it belongs to another session.
+    """
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception as e:
+        stats.record(time.perf_counter() - start, error=type(e).__name__)
+        return
+    elapsed = time.perf_counter() - start
+    stats.record(elapsed, mismatch=check(result))
+
+
+def simulate_user(user_id, driver, symbols, iterations, think_time, stats, seed):
+    """Replay what a browser session does: pick a ticker and view, fire both callbacks"""
+    rng = random.Random(seed + user_id)
+    for _ in range(iterations):
+        symbol = rng.choice(symbols)
+        option = rng.choice(["Volatility", "Price"])
+        ticker = symbol.split('-')[0]
+
+        #`plot_graph` titles the figure from the shared `ProcessWorkflow.ticker`
+        _timed(stats["price_volatility_graph"], driver.call_price_volatility_graph, symbol, option,
+               check=lambda title: title is None or not title.startswith(f"{ticker} "))
+
+        #`predict` titles the figure from its local ticker, but `predict_volatility` loads the
+        #model for the shared `ProcessWorkflow.ticker`, so compare the model actually loaded.
+        #Both drivers run the callback on the calling thread, so a thread-local is enough.
+        _loaded.ticker = None
+        _timed(stats["predict"], driver.call_predict, symbol,
+               check=lambda title: getattr(_loaded, "ticker", None) != ticker)
+
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+
+def run(users, iterations, mode="direct", think_time=0.0, api_latency=0.0, history_days=6000, skip_sleeps=False,
+        stale_models=False, seed=42, keep_workspace=False):
+    """Run the load test and return one summary dict per callback
+
+    Parameters:
+    -----------
+    users: int
+        Number of concurrent simulated sessions.
+    iterations: int
+        Ticker selections each session makes.
+    mode: str
+        'direct' calls the callback functions, 'http' goes through the Flask test client.
+    think_time: float
+        Upper bound in seconds of the random pause between selections.
+    api_latency: float
+        Simulated AlphaVantage round trip in seconds.
+    history_days: int
+        Business days of synthetic history in each AlphaVantage response.
+    skip_sleeps: bool
+        Disable the fixed `time.sleep` calls inside the callbacks.
+    stale_models: bool
+        Seed models dated yesterday so the `fit_model` path of `predict` is measured.
+    """
+    stub = StubAlphaVantage(n_days=history_days, latency=api_latency, seed=seed)
+
+    with loadtest_workspace(stub, skip_sleeps=skip_sleeps, stale_models=stale_models,
+                            keep_workspace=keep_workspace) as app:
+        #Only count the requests made under load, not the ones used to pre-fit models
+        stub.n_requests = 0
+
+        driver = HttpDriver(app) if mode == "http" else DirectDriver(app)
+        stats = {name: CallbackStats(name) for name in ("price_volatility_graph", "predict")}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            futures = [
+                executor.submit(simulate_user, u, driver, app.item_list, iterations, think_time, stats, seed)
+                for u in range(users)
+            ]
+            for future in futures:
+                future.result()
+        wall_time = time.perf_counter() - start
+
+    results = [s.summary(wall_time) for s in stats.values()]
+    for result in results:
+        result.update({"mode": mode, "users": users, "wall_time_s": wall_time, "api_requests": stub.n_requests})
+    return results
+
+
+def print_report(results):
+    header = f"{'callback':<24}{'reqs':>6}{'rps':>9}{'err%':>8}{'mism':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['callback']:<24}{r['requests']:>6}{r['throughput_rps']:>9.2f}{r['error_rate'] * 100:>8.1f}"
+            f"{r['mismatches']:>6}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}"
+        )
+        for error, count in r["error_types"].items():
+            print(f"    {error}: {count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-user load test for the volatility predictor callbacks")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=3, help="ticker selections per session")
+    parser.add_argument("--mode", choices=["direct", "http"], default="direct")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max seconds between selections")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated AlphaVantage latency in seconds")
+    parser.add_argument("--history-days", type=int, default=6000, help="business days of synthetic history per ticker")
+    parser.add_argument("--skip-sleeps", action="store_true", help="disable the fixed sleeps inside the callbacks")
+    parser.add_argument("--stale-models", action="store_true", help="seed models dated yesterday to load-test the fit path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    parser.add_argument("--keep-workspace", action="store_true", help="keep the temporary database and models")
+    parser.add_argument("--strict", action="store_true", help="exit non-zero if any callback call failed")
+    args = parser.parse_args(argv)
+
+    results = run(
+        users=args.users,
+        iterations=args.iterations,
+        mode=args.mode,
+        think_time=args.think_time,
+        api_latency=args.api_latency,
+        history_days=args.history_days,
+        skip_sleeps=args.skip_sleeps,
+        stale_models=args.stale_models,
+        seed=args.seed,
+        keep_workspace=args.keep_workspace,
+    )
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    #A callback that never succeeded measured nothing, so its latencies are meaningless
+    failed = [r for r in results if r["requests"] and r["error_rate"] == 1.0]
+    if failed:
+        sys.exit("Load test failed: every call failed for " + ", ".join(r["callback"] for r in failed))
+    if args.strict and any(r["errors"] for r in results):
+        sys.exit("Load test failed: at least one callback call raised an error")
+
+
+if __name__ == "__main__":
+    main()